@@ -1,291 +1,357 @@
-import uuid        # Generate unique session IDs
-import logging     # Application logging
-from fastapi import FastAPI, HTTPException  
-# ↑ FastAPI = modern web framework (like Flask but faster)
-# ↑ HTTPException = handles errors with proper HTTP status codes
-
-from pydantic import BaseModel  
-# ↑ Pydantic = data validation library (ensures API requests have correct format)
-
-from typing import List, Optional  
-# ↑ Type hints for better code clarity and auto-completion
-
-
-# ========== STEP 1: LOAD ENVIRONMENT VARIABLES ==========
-# CRITICAL: Must happen BEFORE importing modules that need env vars
-from dotenv import load_dotenv
-load_dotenv(override=True)  
-# Reads .env file and sets environment variables
-# override=True = .env values replace system environment variables
-# Example .env contents:
-#   AZURE_SEARCH_KEY=abc123
-#   APPLICATIONINSIGHTS_CONNECTION_STRING=InstrumentationKey=...
-
-
-# ========== STEP 2: INITIALIZE TELEMETRY ==========
-from src.api.telemetry import setup_telemetry
-setup_telemetry()  
-# ☝️ "Activates the sensors" - starts tracking all API activity
-# Must happen AFTER load_dotenv() but BEFORE creating FastAPI app
-
-
-# ========== STEP 3: IMPORT WORKFLOW GRAPH ==========
-from src.graph.workflow import app as compliance_graph
-# Imports your LangGraph workflow (Indexer → Auditor)
-# Renamed to 'compliance_graph' to avoid confusion with FastAPI's 'app'
-
-
-# ========== STEP 4: CONFIGURE LOGGING ==========
-logging.basicConfig(level=logging.INFO)  
-# Sets default log level (INFO = important events, not debug spam)
-
-logger = logging.getLogger("api-server")  
-# Creates named logger for this module
-
-
-# ========== STEP 5: CREATE FASTAPI APPLICATION ==========
-app = FastAPI(
-    # Metadata for auto-generated API documentation (Swagger UI)
-    title="Brand Guardian AI API",
-    description="API for auditing video content against brand compliance rules.",
-    version="1.0.0"
-)
-# FastAPI automatically creates:
-# - Interactive docs at http://localhost:8000/docs
-# - OpenAPI schema at http://localhost:8000/openapi.json
-
-
-# ========== STEP 6: DEFINE DATA MODELS (PYDANTIC) ==========
-
-# --- REQUEST MODEL ---
-class AuditRequest(BaseModel):
-    """
-    Defines the expected structure of incoming API requests.
-    
-    Pydantic validates that:
-    - The request contains a 'video_url' field
-    - The value is a string (not int, list, etc.)
-    
-    Example valid request:
-    {
-        "video_url": "https://youtu.be/abc123"
-    }
-    
-    Example invalid request (raises 422 error):
-    {
-        "video_url": 12345  ← Not a string!
-    }
-    """
-    video_url: str  # Required string field
-
-
-# --- NESTED MODEL ---
-class ComplianceIssue(BaseModel):
-    """
-    Defines the structure of a single compliance violation.
-    
-    Used inside AuditResponse to represent each violation found.
-    """
-    category: str      # Example: "Misleading Claims"
-    severity: str      # Example: "CRITICAL"
-    description: str   # Example: "Absolute guarantee detected at 00:32"
-
-
-# --- RESPONSE MODEL ---
-class AuditResponse(BaseModel):
-    """
-    Defines the structure of API responses.
-    
-    FastAPI uses this to:
-    1. Validate the response before sending (catches bugs)
-    2. Auto-generate API documentation (shows users what to expect)
-    3. Provide type hints for frontend developers
-    
-    Example response:
-    {
-        "session_id": "ce6c43bb-c71a-4f16-a377-8b493502fee2",
-        "video_id": "vid_ce6c43bb",
-        "status": "FAIL",
-        "final_report": "Video contains 2 critical violations...",
-        "compliance_results": [
-            {
-                "category": "Misleading Claims",
-                "severity": "CRITICAL",
-                "description": "Absolute guarantee at 00:32"
-            }
-        ]
-    }
-    """
-    session_id: str                           # Unique audit session ID
-    video_id: str                             # Shortened video identifier
-    status: str                               # PASS or FAIL
-    final_report: str                         # AI-generated summary
-    compliance_results: List[ComplianceIssue] # List of violations (can be empty)
-
-
-# ========== STEP 7: DEFINE MAIN ENDPOINT ==========
-@app.post("/audit", response_model=AuditResponse)
-# ↑ @app.post = Decorator that registers this function as a POST endpoint
-# ↑ "/audit" = URL path (http://localhost:8000/audit)
-# ↑ response_model = Tells FastAPI to validate response matches AuditResponse
-
-async def audit_video(request: AuditRequest):
-    """
-    Main API endpoint that triggers the compliance audit workflow.
-    
-    HTTP Method: POST
-    URL: http://localhost:8000/audit
-    
-    Request Body:
-    {
-        "video_url": "https://youtu.be/abc123"
-    }
-    
-    Response: AuditResponse object (defined above)
-    
-    Process:
-    1. Generate unique session ID
-    2. Prepare input for LangGraph workflow
-    3. Invoke the graph (Indexer → Auditor)
-    4. Return formatted results
-    """
-    
-    # ========== GENERATE SESSION ID ==========
-    session_id = str(uuid.uuid4())  
-    # Creates unique ID like: "ce6c43bb-c71a-4f16-a377-8b493502fee2"
-    
-    video_id_short = f"vid_{session_id[:8]}"  
-    # Takes first 8 characters: "vid_ce6c43bb"
-    # Easier to reference in logs/UI than full UUID
-    
-    # ========== LOG INCOMING REQUEST ==========
-    logger.info(f"Received Audit Request: {request.video_url} (Session: {session_id})")
-    # Example output: "Received Audit Request: https://youtu.be/abc (Session: ce6c43bb...)"
-
-    # ========== PREPARE GRAPH INPUT ==========
-    initial_inputs = {
-        "video_url": request.video_url,  # From the API request
-        "video_id": video_id_short,      # Generated ID
-        "compliance_results": [],        # Will be populated by Auditor
-        "errors": []                     # Tracks any processing errors
-    }
-
-    try:
-        # ========== INVOKE LANGGRAPH WORKFLOW ==========
-        # This is the SAME logic from main.py - just wrapped in an API
-        final_state = compliance_graph.invoke(initial_inputs)
-        # ↑ Blocking call - waits for entire workflow to complete
-        # ↑ Flow: START → Indexer → Auditor → END
-        # ↑ Returns: Final state dictionary with all results
-        
-        # NOTE: In production, you'd use:
-        # await compliance_graph.ainvoke(initial_inputs)
-        # ↑ Async version - doesn't block the server while processing
-        
-        # ========== MAP GRAPH OUTPUT TO API RESPONSE ==========
-        return AuditResponse(
-            session_id=session_id,
-            video_id=final_state.get("video_id"),  
-            # .get() safely retrieves value (None if missing)
-            
-            status=final_state.get("final_status", "UNKNOWN"),  
-            # Defaults to "UNKNOWN" if key doesn't exist
-            
-            final_report=final_state.get("final_report", "No report generated."),
-            
-            compliance_results=final_state.get("compliance_results", [])
-            # Returns empty list [] if no violations
-        )
-        # FastAPI automatically converts this Pydantic object to JSON
-
-    except Exception as e:
-        # ========== ERROR HANDLING ==========
-        logger.error(f"Audit Failed: {str(e)}")  
-        # Log the error for debugging
-        
-        raise HTTPException(
-            status_code=500,  # 500 = Internal Server Error
-            detail=f"Workflow Execution Failed: {str(e)}"
-            # Returns this error message to the client
-        )
-        # Example error response:
-        # {
-        #     "detail": "Workflow Execution Failed: YouTube download error"
-        # }
-
-
-# ========== STEP 8: HEALTH CHECK ENDPOINT ==========
-@app.get("/health")
-# ↑ GET request at http://localhost:8000/health
-def health_check():
-    """
-    Simple endpoint to verify the API is running.
-    
-    Used by:
-    - Load balancers (to check if server is alive)
-    - Monitoring systems (uptime checks)
-    - Developers (quick test that server started)
-    
-    Example usage:
-    curl http://localhost:8000/health
-    
-    Response:
-    {
-        "status": "healthy",
-        "service": "Brand Guardian AI"
-    }
-    """
-    return {"status": "healthy", "service": "Brand Guardian AI"}
-    # FastAPI automatically converts dict to JSON response
-
-
-# ========== STEP 9: RUN INSTRUCTIONS (IN COMMENTS) ==========
-'''
-To execute: 
-uv run uvicorn backend.src.api.server:app --reload
-
-Command breakdown:
-- uv run          = Run with UV package manager
-- uvicorn         = ASGI server (like Gunicorn but async)
-- backend.src.api.server:app = Python path to FastAPI app object
-- --reload        = Auto-restart server when code changes (dev mode)
-
-Server starts at: http://localhost:8000
-
-Access points:
-- API Docs:    http://localhost:8000/docs (interactive Swagger UI)
-- Health:      http://localhost:8000/health
-- Main API:    POST http://localhost:8000/audit
-'''
-
-'''
-## How the API Works (Request Flow)
-```
-1. Client sends POST request:
-   POST http://localhost:8000/audit
-   Body: {"video_url": "https://youtu.be/abc123"}
-   
-2. FastAPI receives request:
-   - Validates request matches AuditRequest model
-   - Calls audit_video() function
-   
-3. audit_video() executes:
-   - Generates session ID
-   - Prepares initial_inputs dict
-   - Calls compliance_graph.invoke()
-   
-4. LangGraph workflow runs:
-   START → Indexer → Auditor → END
-   
-5. Function returns AuditResponse:
-   - FastAPI validates response matches model
-   - Converts Pydantic object to JSON
-   - Sends HTTP response to client
-   
-6. Azure Monitor captures:
-   - Request duration
-   - HTTP status code
-   - Any errors
-   - Graph execution trace
-
+import os          # Read tuning knobs from environment variables
+import secrets     # Generate unique session IDs (C-implemented, faster than uuid4)
+import asyncio     # Semaphore for audit admission control
+import logging     # Application logging
+from fastapi import FastAPI, HTTPException, Response
+# ↑ FastAPI = modern web framework (like Flask but faster)
+# ↑ HTTPException = handles errors with proper HTTP status codes
+# ↑ Response = raw response, used for the pre-encoded health payload
+
+from fastapi.responses import ORJSONResponse
+# ↑ Returned directly from /audit so FastAPI skips its response-model
+#   revalidation + jsonable_encoder pass (we already built the model)
+# ↑ Backed by orjson, which encodes JSON 2-3x faster than stdlib json
+
+import orjson
+# ↑ Fast JSON encoder (Rust-based) - used to pre-build the /health body
+
+from pydantic import BaseModel  
+# ↑ Pydantic = data validation library (ensures API requests have correct format)
+
+from typing import List, Optional  
+# ↑ Type hints for better code clarity and auto-completion
+
+
+# ========== STEP 1: LOAD ENVIRONMENT VARIABLES ==========
+# CRITICAL: Must happen BEFORE importing modules that need env vars
+from dotenv import load_dotenv
+load_dotenv(override=True)  
+# Reads .env file and sets environment variables
+# override=True = .env values replace system environment variables
+# Example .env contents:
+#   AZURE_SEARCH_KEY=abc123
+#   APPLICATIONINSIGHTS_CONNECTION_STRING=InstrumentationKey=...
+
+
+# ========== STEP 2: INITIALIZE TELEMETRY ==========
+from src.api.telemetry import setup_telemetry
+setup_telemetry()  
+# ☝️ "Activates the sensors" - starts tracking all API activity
+# Must happen AFTER load_dotenv() but BEFORE creating FastAPI app
+
+
+# ========== STEP 3: IMPORT WORKFLOW GRAPH ==========
+from src.graph.workflow import app as compliance_graph
+# Imports your LangGraph workflow (Indexer → Auditor)
+# Renamed to 'compliance_graph' to avoid confusion with FastAPI's 'app'
+
+
+# ========== STEP 4: CONFIGURE LOGGING ==========
+# The ONE place root logging gets configured - module-level basicConfig
+# calls elsewhere were removed (second calls are no-ops that still take
+# the logging lock and add import-time side effects)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(name)s %(levelname)s %(message)s",
+)
+# Sets default log level (INFO = important events, not debug spam)
+
+logger = logging.getLogger("api-server")  
+# Creates named logger for this module
+
+
+# ========== STEP 5: CREATE FASTAPI APPLICATION ==========
+app = FastAPI(
+    # Metadata for auto-generated API documentation (Swagger UI)
+    title="Brand Guardian AI API",
+    description="API for auditing video content against brand compliance rules.",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+    # ↑ Every endpoint serializes via orjson instead of stdlib json
+)
+# FastAPI automatically creates:
+# - Interactive docs at http://localhost:8000/docs
+# - OpenAPI schema at http://localhost:8000/openapi.json
+
+
+# ========== STEP 6: DEFINE DATA MODELS (PYDANTIC) ==========
+
+# --- REQUEST MODEL ---
+class AuditRequest(BaseModel):
+    """
+    Defines the expected structure of incoming API requests.
+    
+    Pydantic validates that:
+    - The request contains a 'video_url' field
+    - The value is a string (not int, list, etc.)
+    
+    Example valid request:
+    {
+        "video_url": "https://youtu.be/abc123"
+    }
+    
+    Example invalid request (raises 422 error):
+    {
+        "video_url": 12345  ← Not a string!
+    }
+    """
+    video_url: str  # Required string field
+
+
+# --- NESTED MODEL ---
+class ComplianceIssue(BaseModel):
+    """
+    Defines the structure of a single compliance violation.
+    
+    Used inside AuditResponse to represent each violation found.
+    """
+    category: str      # Example: "Misleading Claims"
+    severity: str      # Example: "CRITICAL"
+    description: str   # Example: "Absolute guarantee detected at 00:32"
+
+
+# --- RESPONSE MODEL ---
+class AuditResponse(BaseModel):
+    """
+    Defines the structure of API responses.
+
+    FastAPI uses this to:
+    1. Auto-generate API documentation (shows users what to expect)
+    2. Provide type hints for frontend developers
+
+    NOTE: The handler serializes the response itself via ORJSONResponse,
+    so this model is documentation/schema only - it is NOT re-validated
+    on the way out (we build the payload, so there is nothing to catch).
+
+    Example response:
+    {
+        "session_id": "ce6c43bbc71a4f16a3778b493502fee2",
+        "video_id": "vid_ce6c43bb",
+        "status": "FAIL",
+        "final_report": "Video contains 2 critical violations...",
+        "compliance_results": [
+            {
+                "category": "Misleading Claims",
+                "severity": "CRITICAL",
+                "description": "Absolute guarantee at 00:32"
+            }
+        ]
+    }
+    """
+    session_id: str                           # Unique audit session ID
+    video_id: str                             # Shortened video identifier
+    status: str                               # PASS or FAIL
+    final_report: str                         # AI-generated summary
+    compliance_results: List[ComplianceIssue] # List of violations (can be empty)
+
+
+# ========== STEP 6.5: AUDIT ADMISSION CONTROL ==========
+# Each audit fans out a YouTube download + Azure VI upload, so unbounded
+# concurrency saturates bandwidth and memory long before CPU. Cap the
+# number of in-flight audits per worker; excess requests queue on the
+# semaphore (still async - the event loop stays free) until a slot opens.
+_AUDIT_SEM = asyncio.Semaphore(int(os.getenv("MAX_CONCURRENT_AUDITS", "4")))
+
+_audit_queue_depth = 0
+# Requests currently waiting for an audit slot - logged so Azure Monitor
+# picks up saturation from the telemetry stream
+
+
+# ========== STEP 7: DEFINE MAIN ENDPOINT ==========
+@app.post("/audit")
+# ↑ @app.post = Decorator that registers this function as a POST endpoint
+# ↑ "/audit" = URL path (http://localhost:8000/audit)
+# ↑ The AuditResponse return annotation below still drives the OpenAPI docs,
+#   but returning an ORJSONResponse directly skips FastAPI's second Pydantic
+#   validation pass + jsonable_encoder on every response
+
+async def audit_video(request: AuditRequest) -> AuditResponse:
+    """
+    Main API endpoint that triggers the compliance audit workflow.
+    
+    HTTP Method: POST
+    URL: http://localhost:8000/audit
+    
+    Request Body:
+    {
+        "video_url": "https://youtu.be/abc123"
+    }
+    
+    Response: JSON matching the AuditResponse schema (defined above)
+
+    Process:
+    1. Generate unique session ID
+    2. Prepare input for LangGraph workflow
+    3. Invoke the graph (Indexer → Auditor)
+    4. Return formatted results
+    """
+    
+    # ========== GENERATE SESSION ID ==========
+    session_id = secrets.token_hex(16)
+    # 128 bits of randomness, same uniqueness as uuid4 but skips the
+    # UUID object construction + hyphenated string formatting
+    # Creates unique ID like: "ce6c43bbc71a4f16a3778b493502fee2"
+
+    video_id_short = f"vid_{session_id[:8]}"
+    # Takes first 8 characters: "vid_ce6c43bb"
+    # Easier to reference in logs/UI than the full session ID
+    
+    # ========== LOG INCOMING REQUEST ==========
+    logger.info("Received Audit Request: %s (Session: %s)", request.video_url, session_id)
+    # Example output: "Received Audit Request: https://youtu.be/abc (Session: ce6c43bb...)"
+
+    # ========== PREPARE GRAPH INPUT ==========
+    initial_inputs = {
+        "video_url": request.video_url,  # From the API request
+        "video_id": video_id_short,      # Generated ID
+        "compliance_results": [],        # Will be populated by Auditor
+        "errors": []                     # Tracks any processing errors
+    }
+
+    global _audit_queue_depth
+    queued = _AUDIT_SEM.locked()
+    if queued:
+        # All slots busy - report saturation before we queue up
+        _audit_queue_depth += 1
+        logger.warning("Audit slots saturated - request queued (depth: %d)", _audit_queue_depth)
+
+    try:
+        # ========== INVOKE LANGGRAPH WORKFLOW (BOUNDED) ==========
+        # This is the SAME logic from main.py - just wrapped in an API
+        try:
+            # Acquire inside try/finally: if the client disconnects while
+            # we wait for a slot, Starlette cancels this task and the
+            # finally still decrements the gauge - otherwise it would
+            # drift upward with every abandoned queued request
+            await _AUDIT_SEM.acquire()
+        finally:
+            if queued:
+                _audit_queue_depth -= 1
+        try:
+            final_state = await compliance_graph.ainvoke(initial_inputs)
+        finally:
+            _AUDIT_SEM.release()
+        # ↑ Async call - the event loop keeps serving other requests while
+        #   this audit waits on YouTube download / Azure VI / LLM I/O
+        # ↑ At most MAX_CONCURRENT_AUDITS (default 4) run at once per worker
+        # ↑ Flow: START → Indexer → Auditor → END
+        # ↑ Returns: Final state dictionary with all results
+
+        # ========== MAP GRAPH OUTPUT TO API RESPONSE ==========
+        # The graph output is data we produced ourselves, so there is
+        # nothing for Pydantic to validate on the way out - build the
+        # payload directly and hand it to orjson. The AuditResponse model
+        # above stays as the documented schema for this endpoint.
+        resp = {
+            "session_id": session_id,
+            "video_id": final_state.get("video_id"),
+            # .get() safely retrieves value (None if missing)
+
+            "status": final_state.get("final_status", "UNKNOWN"),
+            # Defaults to "UNKNOWN" if key doesn't exist
+
+            "final_report": final_state.get("final_report", "No report generated."),
+
+            "compliance_results": final_state.get("compliance_results", [])
+            # Plain dicts straight from the graph state ([] if no violations)
+        }
+        return ORJSONResponse(content=resp)
+
+    except Exception as e:
+        # ========== ERROR HANDLING ==========
+        logger.error("Audit Failed: %s", e)
+        # Log the error for debugging
+        
+        raise HTTPException(
+            status_code=500,  # 500 = Internal Server Error
+            detail=f"Workflow Execution Failed: {str(e)}"
+            # Returns this error message to the client
+        )
+        # Example error response:
+        # {
+        #     "detail": "Workflow Execution Failed: YouTube download error"
+        # }
+
+
+# ========== STEP 8: HEALTH CHECK ENDPOINT ==========
+
+# Health payload never changes, so encode it to bytes ONCE at import time.
+# Every probe then skips the dict -> JSON conversion entirely.
+_HEALTH = orjson.dumps({"status": "healthy", "service": "Brand Guardian AI"})
+
+
+@app.get("/health")
+# ↑ GET request at http://localhost:8000/health
+def health_check():
+    """
+    Simple endpoint to verify the API is running.
+    
+    Used by:
+    - Load balancers (to check if server is alive)
+    - Monitoring systems (uptime checks)
+    - Developers (quick test that server started)
+    
+    Example usage:
+    curl http://localhost:8000/health
+    
+    Response:
+    {
+        "status": "healthy",
+        "service": "Brand Guardian AI"
+    }
+    """
+    return Response(content=_HEALTH, media_type="application/json")
+    # Pre-encoded bytes - no per-request JSON serialization at all
+
+
+# ========== STEP 9: RUN INSTRUCTIONS (IN COMMENTS) ==========
+'''
+To execute: 
+uv run uvicorn backend.src.api.server:app --reload
+
+Command breakdown:
+- uv run          = Run with UV package manager
+- uvicorn         = ASGI server (like Gunicorn but async)
+- backend.src.api.server:app = Python path to FastAPI app object
+- --reload        = Auto-restart server when code changes (dev mode)
+
+Server starts at: http://localhost:8000
+
+Access points:
+- API Docs:    http://localhost:8000/docs (interactive Swagger UI)
+- Health:      http://localhost:8000/health
+- Main API:    POST http://localhost:8000/audit
+'''
+
+'''
+## How the API Works (Request Flow)
+```
+1. Client sends POST request:
+   POST http://localhost:8000/audit
+   Body: {"video_url": "https://youtu.be/abc123"}
+   
+2. FastAPI receives request:
+   - Validates request matches AuditRequest model
+   - Calls audit_video() function
+   
+3. audit_video() executes:
+   - Generates session ID
+   - Prepares initial_inputs dict
+   - Waits for an audit slot (MAX_CONCURRENT_AUDITS semaphore)
+   - Awaits compliance_graph.ainvoke()
+
+4. LangGraph workflow runs:
+   START → Indexer → Auditor → END
+   
+5. Function returns ORJSONResponse:
+   - Payload dict is built straight from graph state (no revalidation)
+   - orjson encodes it to JSON bytes
+   - Sends HTTP response to client
+   
+6. Azure Monitor captures:
+   - Request duration
+   - HTTP status code
+   - Any errors
+   - Graph execution trace
+
 '''
\ No newline at end of file